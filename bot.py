@@ -0,0 +1,473 @@
+import os
+import re
+import asyncio
+import time
+import logging
+import orjson
+from collections import OrderedDict
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+from telegram import Update
+from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
+from psycopg.rows import dict_row, tuple_row
+from psycopg.types.json import Jsonb
+from psycopg_pool import AsyncConnectionPool
+import numpy as np
+from rapidfuzz import process, fuzz, utils
+
+# Logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Environment variables
+TELEGRAM_BOT_TOKEN = os.environ["TELEGRAM_BOT_TOKEN"]
+DATABASE_URL = os.environ["DATABASE_URL"]
+ALLOWED_CHAT_ID = int(os.environ.get("ALLOWED_CHAT_ID", 0))
+ADMIN_USER_IDS = {int(uid) for uid in os.environ.get("ADMIN_USER_IDS", "").split(",") if uid.strip()}
+# Off by default: transaction-mode poolers (e.g. Supabase on port 6543) can't keep
+# server-side prepared statements. Enable only for a direct or session-mode connection.
+USE_PREPARED_STATEMENTS = os.environ.get("USE_PREPARED_STATEMENTS", "").lower() in ("1", "true", "yes")
+
+# Timezone for display (Central Time)
+DISPLAY_TZ = ZoneInfo("America/Chicago")
+
+# Acknowledgment pattern; the name is bounded to one line of 120 characters so non-matching
+# chatter fails fast. Commas are allowed inside the name for suffixes like "John Smith, Jr.".
+ACK_PATTERN = re.compile(
+    r"\bI,?\s+([^\n]{1,120}?)\s*,?\s+acknowledge\s+and\s+agree\s+to\s+the\s+HHG\s+Employee\s+Handbook\s+(v[\d\-]+)",
+    re.IGNORECASE
+)
+# Cheap length and substring checks that rule out most messages before the regex runs;
+# the shortest possible acknowledgment is well over MIN_ACK_LENGTH characters
+ACK_KEYWORD = "acknowledge"
+MIN_ACK_LENGTH = 40
+
+# Opened/closed by the Application lifecycle hooks so it lives on the bot's event loop
+POOL = AsyncConnectionPool(
+    DATABASE_URL,
+    min_size=2,
+    max_size=10,
+    # 5 is psycopg's default; None turns automatic preparing off
+    kwargs={"row_factory": dict_row, "prepare_threshold": 5 if USE_PREPARED_STATEMENTS else None},
+    open=False
+)
+
+class LRUCache:
+    """Bounded dict that evicts the least recently used entry."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def get(self, key):
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+# How long in-memory employee data (roster, exact-name hits) is trusted before re-reading
+ROSTER_REFRESH_SECONDS = 60
+
+# lower(full_name) -> (cached_at, {"id", "full_name"}) for names that matched exactly
+_EMPLOYEE_CACHE = LRUCache(maxsize=1024)
+
+async def find_employee_by_name(conn, full_name: str, name_lower: str):
+    """Find employee by exact full_name match (case-insensitive). Return employee record or None.
+
+    name_lower (full_name.lower()) is only the cache key; the query lowercases in Postgres,
+    whose lower() differs from Python's for a few characters (e.g. "İ").
+    """
+    cached = _EMPLOYEE_CACHE.get(name_lower)
+    # Expire hits so HR renames/removals are seen even if no fuzzy lookup refreshes the roster
+    if cached and time.monotonic() - cached[0] < ROSTER_REFRESH_SECONDS:
+        return cached[1]
+    
+    async with conn.cursor() as cur:
+        await cur.execute(
+            "SELECT id, full_name FROM employees WHERE LOWER(full_name) = LOWER(%s)",
+            (full_name,),
+            prepare=USE_PREPARED_STATEMENTS
+        )
+        employee = await cur.fetchone()
+    
+    if employee:
+        _EMPLOYEE_CACHE.put(name_lower, (time.monotonic(), employee))
+    return employee
+
+# (lower(input), threshold) -> matches; typos tend to be re-sent verbatim
+_SIMILAR_CACHE = LRUCache(maxsize=256)
+
+# All employee names, re-read from the database at most once per refresh window.
+# Names are normalized (rapidfuzz default_process) once per refresh, not once per lookup.
+_ROSTER = {"at": float("-inf"), "names": {}, "normalized": {}, "bigrams": {}, "by_tokens": {}}
+
+def _bigrams(name_norm: str) -> frozenset:
+    """Character bigrams of a normalized name, used to prefilter fuzzy candidates."""
+    return frozenset(name_norm[i:i + 2] for i in range(len(name_norm) - 1))
+
+async def _load_roster(conn) -> dict:
+    """Return the in-memory roster, refreshing it from the database when stale."""
+    now = time.monotonic()
+    if now - _ROSTER["at"] < ROSTER_REFRESH_SECONDS:
+        return _ROSTER
+    
+    # Stream plain tuples straight into the dict rather than materializing a list of row dicts
+    async with conn.cursor(row_factory=tuple_row) as cur:
+        names = {
+            emp_id: full_name
+            async for emp_id, full_name in cur.stream("SELECT id, full_name FROM employees WHERE full_name IS NOT NULL")
+        }
+    
+    if names != _ROSTER["names"]:
+        # HR edited the roster; cached lookups may name renamed or removed employees
+        _EMPLOYEE_CACHE.clear()
+        _SIMILAR_CACHE.clear()
+        normalized = {emp_id: utils.default_process(name) for emp_id, name in names.items()}
+        _ROSTER["names"] = names
+        _ROSTER["normalized"] = normalized
+        _ROSTER["bigrams"] = {emp_id: _bigrams(norm) for emp_id, norm in normalized.items()}
+        # Names aren't unique, so each token set maps to every employee sharing it
+        by_tokens = {}
+        for emp_id, norm in normalized.items():
+            by_tokens.setdefault(tuple(sorted(norm.split())), []).append(emp_id)
+        _ROSTER["by_tokens"] = by_tokens
+    _ROSTER["at"] = now
+    return _ROSTER
+
+async def find_similar_names(conn, name_lower: str, threshold: float = 0.6):
+    """Find employees with names similar to the lowercased input. Returns list of potential matches."""
+    roster = await _load_roster(conn)
+    
+    key = (name_lower, threshold)
+    cached = _SIMILAR_CACHE.get(key)
+    if cached is not None:
+        return cached
+    
+    query = utils.default_process(name_lower)
+    names = roster["names"]
+    
+    # Same words in a different order (e.g. "Smith John"): no scoring needed
+    exact_ids = roster["by_tokens"].get(tuple(sorted(query.split())))
+    if exact_ids:
+        matches = [{"id": emp_id, "full_name": names[emp_id], "score": 1.0} for emp_id in exact_ids[:3]]
+        _SIMILAR_CACHE.put(key, matches)
+        return matches
+    
+    # Only names sharing a couple of character bigrams with the input can score above threshold.
+    # A single word ("jon") is compared against part of a longer name, so one shared bigram is enough.
+    query_bigrams = _bigrams(query)
+    min_shared = 1 if " " not in query else min(2, len(query_bigrams))
+    candidates = {
+        emp_id: norm for emp_id, norm in roster["normalized"].items()
+        if len(query_bigrams & roster["bigrams"][emp_id]) >= min_shared
+    }
+    
+    # WRatio is token-order aware, so "Smith John" still scores well against "John Smith"
+    results = process.extract(
+        query,
+        candidates,
+        scorer=fuzz.WRatio,
+        processor=None,
+        limit=3,
+        score_cutoff=threshold * 100
+    )
+    matches = [{"id": emp_id, "full_name": names[emp_id], "score": score / 100} for _, score, emp_id in results]
+    _SIMILAR_CACHE.put(key, matches)
+    return matches
+
+async def admin_search(conn, queries: list[str], threshold: float = 0.6, limit: int = 3):
+    """Find the closest employees for each of several names at once. Returns one match list per query."""
+    roster = await _load_roster(conn)
+    names = roster["names"]
+    normalized = roster["normalized"]
+    normalized_queries = [utils.default_process(q) for q in queries]
+    
+    if not normalized:
+        return [[] for _ in queries]
+    
+    emp_ids = list(normalized)
+    # Full query x roster matrix in one parallel C++ call; uint8 keeps it a quarter the size of float32
+    # cdist is CPU-bound (and multi-threaded); keep it off the event loop
+    scores = await asyncio.to_thread(
+        process.cdist,
+        normalized_queries,
+        list(normalized.values()),
+        scorer=fuzz.WRatio,
+        processor=None,
+        score_cutoff=int(threshold * 100),
+        dtype=np.uint8,
+        workers=-1
+    )
+    # Top-k columns per row without sorting the whole row; only those k get ordered
+    k = min(limit, len(emp_ids))
+    top = np.argpartition(scores, -k, axis=1)[:, -k:]
+    
+    results = []
+    for row, cols in zip(scores, top):
+        ranked = sorted(cols, key=lambda col: row[col], reverse=True)
+        results.append([
+            {"id": emp_ids[col], "full_name": names[emp_ids[col]], "score": int(row[col]) / 100}
+            for col in ranked if row[col]
+        ])
+    return results
+
+async def record_ack(conn, employee_id: int, telegram_user_id: str, telegram_username: str, version: str, ack_text: str, message: dict, acknowledged_at: datetime):
+    """Link employee's Telegram info and insert acknowledgment in one round-trip.
+
+    Returns the new acknowledgment id, or None if this version was already acknowledged.
+    """
+    async with conn.cursor() as cur:
+        await cur.execute("""
+            WITH ins AS (
+                INSERT INTO acknowledgments (
+                    employee_id,
+                    handbook_version,
+                    ack_text,
+                    acknowledged_at,
+                    telegram_chat_id,
+                    telegram_message_id,
+                    telegram_message_date,
+                    raw_telegram_json
+                ) VALUES (
+                    %(employee_id)s, %(version)s, %(ack_text)s, %(acknowledged_at)s,
+                    %(chat_id)s, %(message_id)s, %(message_date)s, %(raw)s
+                )
+                ON CONFLICT (employee_id, handbook_version) DO NOTHING
+                RETURNING id
+            ),
+            upd AS (
+                UPDATE employees
+                SET telegram_user_id = %(telegram_user_id)s,
+                    telegram_username = %(telegram_username)s,
+                    updated_at = NOW()
+                WHERE id = %(employee_id)s AND EXISTS (SELECT 1 FROM ins)
+            )
+            SELECT id FROM ins
+        """, {
+            "employee_id": employee_id,
+            "telegram_user_id": telegram_user_id,
+            "telegram_username": telegram_username,
+            "version": version,
+            "ack_text": ack_text,
+            "acknowledged_at": acknowledged_at,
+            "chat_id": message["chat_id"],
+            "message_id": message["message_id"],
+            "message_date": message["date"],
+            # orjson emits UTF-8 bytes, which psycopg sends as-is
+            "raw": Jsonb(message["raw"], dumps=orjson.dumps)
+        }, prepare=USE_PREPARED_STATEMENTS)
+        row = await cur.fetchone()
+        await conn.commit()
+        return row["id"] if row else None
+
+ACK_BULK_BATCH_SIZE = 1000
+
+async def insert_acknowledgments_bulk(conn, rows: list[tuple]):
+    """Insert many acknowledgment records (backfill/replay), pipelined and committed per batch.
+
+    Each row is (employee_id, handbook_version, ack_text, acknowledged_at,
+    telegram_chat_id, telegram_message_id, telegram_message_date, raw_telegram_json),
+    with raw_telegram_json as a plain dict like message_data["raw"]; it is wrapped as Jsonb here.
+    Unlike record_ack, this does not update employees.telegram_user_id/telegram_username.
+    """
+    async with conn.cursor() as cur:
+        for start in range(0, len(rows), ACK_BULK_BATCH_SIZE):
+            batch = [(*row[:7], Jsonb(row[7], dumps=orjson.dumps)) for row in rows[start:start + ACK_BULK_BATCH_SIZE]]
+            async with conn.pipeline():
+                await cur.executemany("""
+                    INSERT INTO acknowledgments (
+                        employee_id,
+                        handbook_version,
+                        ack_text,
+                        acknowledged_at,
+                        telegram_chat_id,
+                        telegram_message_id,
+                        telegram_message_date,
+                        raw_telegram_json
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (employee_id, handbook_version) DO NOTHING
+                """, batch)
+            await conn.commit()
+
+async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Process incoming messages for acknowledgment phrases."""
+    message = update.message
+    if not message or not message.text:
+        return
+    
+    if ALLOWED_CHAT_ID and message.chat_id != ALLOWED_CHAT_ID:
+        return
+    
+    text = message.text
+    if len(text) < MIN_ACK_LENGTH or ACK_KEYWORD not in text.lower():
+        return
+    
+    match = ACK_PATTERN.search(text)
+    if not match:
+        return
+    
+    full_name = match.group(1).strip()
+    name_lower = full_name.lower()
+    version = match.group(2).strip()
+    
+    user = message.from_user
+    telegram_user_id = str(user.id)
+    telegram_username = user.username or ""
+    
+    logger.info(f"Processing acknowledgment from {full_name}, Telegram ID: {telegram_user_id}, Username: {telegram_username}")
+    
+    message_data = {
+        "chat_id": message.chat_id,
+        "message_id": message.message_id,
+        "date": message.date,
+        "raw": {
+            "message_id": message.message_id,
+            "from": {
+                "id": user.id,
+                "is_bot": user.is_bot,
+                "first_name": user.first_name,
+                "last_name": user.last_name,
+                "username": user.username,
+            },
+            "chat": {
+                "id": message.chat_id,
+                "type": message.chat.type,
+                "title": getattr(message.chat, "title", None),
+            },
+            "date": int(message.date.timestamp()),
+            "text": message.text,
+        }
+    }
+    
+    # Single clock read: stored as acknowledged_at and shown in the confirmation
+    acknowledged_at = datetime.now(timezone.utc)
+    
+    try:
+        # Connection goes back to the pool before any Telegram replies are sent
+        async with POOL.connection() as conn:
+            employee = await find_employee_by_name(conn, full_name, name_lower)
+            
+            if employee:
+                ack_id = await record_ack(
+                    conn, employee["id"], telegram_user_id, telegram_username,
+                    version, text, message_data, acknowledged_at
+                )
+            else:
+                similar = await find_similar_names(conn, name_lower)
+        
+        if not employee:
+            if similar:
+                suggestions = "\n".join([f"• {s['full_name']}" for s in similar])
+                await message.reply_text(
+                    f"⚠️ Name not found: \"{full_name}\"\n\n"
+                    f"Did you mean one of these?\n{suggestions}\n\n"
+                    f"Please resend using your exact name as shown above.\n\n"
+                    f"Example:\nI, {similar[0]['full_name']}, acknowledge and agree to the HHG Employee Handbook {version}"
+                )
+            else:
+                await message.reply_text(
+                    f"⚠️ Name not found: \"{full_name}\"\n\n"
+                    f"Please use your full name exactly as it appears in our system.\n\n"
+                    f"Contact your manager if you need help."
+                )
+            return
+        
+        db_full_name = employee["full_name"]
+        
+        if ack_id is None:
+            await message.reply_text(
+                f"✓ {db_full_name}, you've already acknowledged handbook {version}."
+            )
+            return
+        
+        # Recorded time in Central Time for display
+        timestamp_display = acknowledged_at.astimezone(DISPLAY_TZ).isoformat(sep=" ", timespec="seconds")
+        
+        logger.info(f"Recorded: {db_full_name} (@{telegram_username}) acknowledged {version}")
+        
+        await message.reply_text(
+            f"✓ Recorded: {db_full_name} acknowledged HHG Employee Handbook {version}\n"
+            f"Timestamp: {timestamp_display}"
+        )
+        
+    except Exception as e:
+        logger.error(f"Error processing acknowledgment: {e}")
+        await message.reply_text(
+            "⚠️ Error recording acknowledgment. Please try again or contact admin."
+        )
+
+MAX_LOOKUP_QUERIES = 20
+# Telegram rejects messages longer than this
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+async def handle_lookup(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Admin command: /lookup followed by names separated by ";" or new lines."""
+    message = update.message
+    if not message or not message.from_user or message.from_user.id not in ADMIN_USER_IDS:
+        return
+    
+    # Drop the "/lookup" token; the rest may span several lines
+    args = message.text.split(None, 1)
+    queries = [q.strip() for q in re.split(r"[;\n]", args[1] if len(args) > 1 else "") if q.strip()]
+    if not queries:
+        await message.reply_text("Usage: /lookup Name One; Name Two")
+        return
+    
+    sections = []
+    if len(queries) > MAX_LOOKUP_QUERIES:
+        sections.append(f"Only the first {MAX_LOOKUP_QUERIES} of {len(queries)} names were searched.")
+        queries = queries[:MAX_LOOKUP_QUERIES]
+    
+    try:
+        async with POOL.connection() as conn:
+            results = await admin_search(conn, queries)
+    except Exception as e:
+        logger.error(f"Error running admin lookup: {e}")
+        await message.reply_text("⚠️ Lookup failed. Please try again.")
+        return
+    
+    for query, matches in zip(queries, results):
+        lines = [f"• {m['full_name']} (id {m['id']}, {m['score']:.0%})" for m in matches] or ["• no close matches"]
+        sections.append(f"\"{query[:100]}\"\n" + "\n".join(lines))
+    
+    # Split across several replies rather than exceed Telegram's message limit
+    reply = ""
+    for section in sections:
+        if reply and len(reply) + 2 + len(section) > TELEGRAM_MESSAGE_LIMIT:
+            await message.reply_text(reply)
+            reply = section
+        else:
+            reply = f"{reply}\n\n{section}" if reply else section
+    await message.reply_text(reply)
+
+async def open_pool(app: Application):
+    """Open the database pool once the event loop is running."""
+    await POOL.open()
+
+async def close_pool(app: Application):
+    """Close the database pool on shutdown."""
+    await POOL.close()
+
+def main():
+    """Start the bot."""
+    app = (
+        Application.builder()
+        .token(TELEGRAM_BOT_TOKEN)
+        .post_init(open_pool)
+        .post_shutdown(close_pool)
+        .build()
+    )
+    app.add_handler(CommandHandler("lookup", handle_lookup))
+    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
+    
+    logger.info("HHG Handbook Bot starting...")
+    app.run_polling(allowed_updates=Update.ALL_TYPES)
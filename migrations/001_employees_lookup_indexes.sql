@@ -0,0 +1,7 @@
+-- Exact-name lookup in find_employee_by_name filters on LOWER(full_name)
+CREATE INDEX IF NOT EXISTS employees_lower_fullname
+    ON employees (lower(full_name));
+
+-- Lookups of employees by their linked Telegram account
+CREATE INDEX IF NOT EXISTS employees_telegram_user_id
+    ON employees (telegram_user_id);
@@ -0,0 +1,6 @@
+-- One acknowledgment per employee per handbook version, enforced by the database.
+-- Fails if duplicates already exist; find them first with:
+--   SELECT employee_id, handbook_version, count(*) FROM acknowledgments
+--   GROUP BY 1, 2 HAVING count(*) > 1;
+ALTER TABLE acknowledgments
+    ADD CONSTRAINT ack_once UNIQUE (employee_id, handbook_version);
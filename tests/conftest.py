@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+from rapidfuzz import utils
+
+# bot.py reads these at import time; the pool is never opened in tests
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test-token")
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/test")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bot  # noqa: E402  (needs the environment above)
+
+
+@pytest.fixture
+def roster(monkeypatch):
+    """Fill bot._ROSTER from {id: full_name} and mark it fresh, so lookups never touch the database."""
+    def fill(names):
+        normalized = {emp_id: utils.default_process(name) for emp_id, name in names.items()}
+        by_tokens = {}
+        for emp_id, norm in normalized.items():
+            by_tokens.setdefault(tuple(sorted(norm.split())), []).append(emp_id)
+        monkeypatch.setattr(bot, "_ROSTER", {
+            "at": float("inf"),
+            "names": names,
+            "normalized": normalized,
+            "bigrams": {emp_id: bot._bigrams(norm) for emp_id, norm in normalized.items()},
+            "by_tokens": by_tokens,
+        })
+        monkeypatch.setattr(bot, "_SIMILAR_CACHE", bot.LRUCache(maxsize=256))
+        return bot._ROSTER
+    return fill
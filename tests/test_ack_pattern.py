@@ -0,0 +1,32 @@
+import pytest
+
+from bot import ACK_PATTERN
+
+
+@pytest.mark.parametrize("text, name, version", [
+    ("I, John Smith, acknowledge and agree to the HHG Employee Handbook v2026-01-20", "John Smith", "v2026-01-20"),
+    ("I John Smith acknowledge and agree to the HHG Employee Handbook v2026-01-20", "John Smith", "v2026-01-20"),
+    ("i, john smith, acknowledge and agree to the hhg employee handbook v2026-01-20", "john smith", "v2026-01-20"),
+    ("  I, Ann Lee acknowledge and agree to the HHG Employee Handbook v1", "Ann Lee", "v1"),
+    ("I, José Núñez, acknowledge and agree to the HHG Employee Handbook v2026-01-20", "José Núñez", "v2026-01-20"),
+    # Suffixes after a comma are part of the name
+    ("I, John Smith, Jr., acknowledge and agree to the HHG Employee Handbook v2026-01-20", "John Smith, Jr.", "v2026-01-20"),
+    # The acknowledgment doesn't have to start the message
+    ("Hi team! I, John Smith, acknowledge and agree to the HHG Employee Handbook v2026-01-20", "John Smith", "v2026-01-20"),
+    # Non-breaking spaces from mobile keyboards / copy-paste
+    ("I,\xa0John Smith,\xa0acknowledge and agree to the HHG Employee Handbook v2026-01-20", "John Smith", "v2026-01-20"),
+])
+def test_matches_acknowledgment(text, name, version):
+    match = ACK_PATTERN.search(text)
+    assert match
+    assert match.group(1).strip() == name
+    assert match.group(2) == version
+
+
+@pytest.mark.parametrize("text", [
+    "I acknowledge the schedule change",
+    "Please acknowledge and agree to the HHG Employee Handbook v2026-01-20 by Friday",
+    "I, John Smith, acknowledge the new schedule",
+])
+def test_ignores_non_acknowledgment(text):
+    assert ACK_PATTERN.search(text) is None
@@ -0,0 +1,96 @@
+import asyncio
+import contextlib
+
+import bot
+from bot import admin_search, handle_lookup
+
+
+ROSTER = {
+    1: "John Smith",
+    2: "Johnny Smithers",
+    3: "Maria Lopez",
+    4: "Priya Natarajan",
+}
+
+
+class FakePool:
+    @contextlib.asynccontextmanager
+    async def connection(self):
+        yield None
+
+
+class FakeUser:
+    id = 7
+
+
+class FakeMessage:
+    def __init__(self, text):
+        self.text = text
+        self.from_user = FakeUser()
+        self.replies = []
+
+    async def reply_text(self, text):
+        self.replies.append(text)
+
+
+class FakeUpdate:
+    def __init__(self, text):
+        self.message = FakeMessage(text)
+
+
+def lookup(monkeypatch, text):
+    monkeypatch.setattr(bot, "POOL", FakePool())
+    monkeypatch.setattr(bot, "ADMIN_USER_IDS", {7})
+    update = FakeUpdate(text)
+    asyncio.run(handle_lookup(update, None))
+    return update.message.replies
+
+
+def test_admin_search_orders_and_drops_below_cutoff(roster):
+    roster(ROSTER)
+    results = asyncio.run(admin_search(None, ["jon smith", "zzz"]))
+    assert [m["id"] for m in results[0]] == [1, 2]
+    scores = [m["score"] for m in results[0]]
+    assert scores == sorted(scores, reverse=True)
+    assert all(0.6 <= s <= 1.0 for s in scores)
+    # Nothing scores above the cutoff, so the zeros argpartition picked are dropped
+    assert results[1] == []
+
+
+def test_admin_search_limit_larger_than_roster(roster):
+    roster({1: "John Smith", 2: "Maria Lopez"})
+    results = asyncio.run(admin_search(None, ["maria lopez"], limit=10))
+    assert [m["id"] for m in results[0]] == [2]
+
+
+def test_admin_search_empty_roster(roster):
+    roster({})
+    assert asyncio.run(admin_search(None, ["john", "maria"])) == [[], []]
+
+
+def test_lookup_ignores_non_admins(monkeypatch, roster):
+    roster(ROSTER)
+    monkeypatch.setattr(bot, "ADMIN_USER_IDS", set())
+    update = FakeUpdate("/lookup John Smith")
+    asyncio.run(handle_lookup(update, None))
+    assert update.message.replies == []
+
+
+def test_lookup_splits_long_replies(monkeypatch, roster):
+    roster({i: f"Employee{i} Withaverylongfamilyname{i}" for i in range(200)})
+    monkeypatch.setattr(bot, "MAX_LOOKUP_QUERIES", 100)
+    queries = ";".join(f"employee{i} withaverylongfamilynam" for i in range(100))
+    replies = lookup(monkeypatch, f"/lookup {queries}")
+    assert len(replies) > 1
+    assert all(len(reply) <= bot.TELEGRAM_MESSAGE_LIMIT for reply in replies)
+    assert sum(reply.count('"employee') for reply in replies) == 100
+
+
+def test_lookup_caps_query_count(monkeypatch, roster):
+    roster(ROSTER)
+    queries = "\n".join(f"name {i}" for i in range(bot.MAX_LOOKUP_QUERIES + 5))
+    replies = lookup(monkeypatch, f"/lookup\n{queries}")
+    assert replies[0].startswith(
+        f"Only the first {bot.MAX_LOOKUP_QUERIES} of {bot.MAX_LOOKUP_QUERIES + 5} names were searched."
+    )
+    assert sum(reply.count('"name ') for reply in replies) == bot.MAX_LOOKUP_QUERIES
@@ -0,0 +1,66 @@
+import asyncio
+import contextlib
+from datetime import datetime, timezone
+
+from psycopg.types.json import Jsonb
+
+import bot
+from bot import insert_acknowledgments_bulk
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def executemany(self, query, params):
+        assert self.conn.in_pipeline
+        self.conn.batches.append(list(params))
+
+
+class FakeConnection:
+    def __init__(self):
+        self.batches = []
+        self.commits = 0
+        self.in_pipeline = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    @contextlib.asynccontextmanager
+    async def pipeline(self):
+        self.in_pipeline = True
+        yield
+        self.in_pipeline = False
+
+    async def commit(self):
+        self.commits += 1
+
+
+def ack_row(i):
+    now = datetime.now(timezone.utc)
+    return (i, "v2026-01-20", f"ack {i}", now, -100, i, now, {"message_id": i, "text": f"ack {i}"})
+
+
+def test_batches_commits_and_wraps_raw_json(monkeypatch):
+    monkeypatch.setattr(bot, "ACK_BULK_BATCH_SIZE", 2)
+    conn = FakeConnection()
+    asyncio.run(insert_acknowledgments_bulk(conn, [ack_row(i) for i in range(5)]))
+
+    assert [len(batch) for batch in conn.batches] == [2, 2, 1]
+    assert conn.commits == len(conn.batches)
+    rows = [row for batch in conn.batches for row in batch]
+    assert [row[0] for row in rows] == list(range(5))
+    assert all(isinstance(row[7], Jsonb) for row in rows)
+    assert rows[0][7].obj == {"message_id": 0, "text": "ack 0"}
+
+
+def test_no_rows_does_nothing():
+    conn = FakeConnection()
+    asyncio.run(insert_acknowledgments_bulk(conn, []))
+    assert conn.batches == [] and conn.commits == 0
@@ -0,0 +1,49 @@
+import asyncio
+
+from bot import find_similar_names
+
+
+ROSTER = {
+    1: "John Smith",
+    2: "Maria Lopez",
+    3: "John Smith",
+    4: "Priya Natarajan",
+}
+
+
+def similar(name, threshold=0.6):
+    # A fresh roster means no connection is needed
+    return asyncio.run(find_similar_names(None, name.lower(), threshold))
+
+
+def test_swapped_tokens_return_every_duplicate(roster):
+    roster(ROSTER)
+    matches = similar("Smith John")
+    assert sorted(m["id"] for m in matches) == [1, 3]
+    assert all(m["full_name"] == "John Smith" and m["score"] == 1.0 for m in matches)
+
+
+def test_single_word_input_still_suggests(roster):
+    roster(ROSTER)
+    matches = similar("jon")
+    assert {m["id"] for m in matches} == {1, 3}
+
+
+def test_typo_suggests_closest_name(roster):
+    roster(ROSTER)
+    matches = similar("Mariah Lopes")
+    assert matches[0]["id"] == 2
+    assert 0.6 <= matches[0]["score"] <= 1.0
+
+
+def test_no_match(roster):
+    roster(ROSTER)
+    assert similar("zzz") == []
+
+
+def test_repeated_typo_served_from_cache(roster):
+    names = roster(ROSTER)
+    first = similar("Mariah Lopes")
+    # Changes to the roster are invisible until the cache is cleared by a refresh
+    names["normalized"].clear()
+    assert similar("Mariah Lopes") is first